@@ -7,11 +7,18 @@ docx-table-title.py
 """
 
 import sys
-import os
+from pathlib import Path
+
 from docx import Document
-from docx.oxml.ns import qn, nsmap
-from docx.oxml import OxmlElement
-from lxml import etree
+from docx.oxml.ns import qn
+from lxml.etree import SubElement
+
+# qn()の結果をモジュール読み込み時にキャッシュしておく
+_Q_SHD = qn('w:shd')
+_Q_COLOR = qn('w:color')
+_Q_VAL = qn('w:val')
+_Q_FILL = qn('w:fill')
+_Q_RPR = qn('w:rPr')
 
 
 def set_cell_shading(cell, color):
@@ -20,15 +27,12 @@ def set_cell_shading(cell, color):
     tcPr = tc.get_or_add_tcPr()
 
     # 既存のshdを削除
-    for shd in tcPr.findall(qn('w:shd')):
-        tcPr.remove(shd)
+    existing = next(tcPr.iterchildren(_Q_SHD), None)
+    if existing is not None:
+        tcPr.remove(existing)
 
     # 新しいshdを作成
-    shd = OxmlElement('w:shd')
-    shd.set(qn('w:val'), 'clear')
-    shd.set(qn('w:color'), 'auto')
-    shd.set(qn('w:fill'), color)
-    tcPr.append(shd)
+    SubElement(tcPr, _Q_SHD, {_Q_VAL: 'clear', _Q_COLOR: 'auto', _Q_FILL: color})
 
 
 def set_run_color(run, color):
@@ -36,13 +40,12 @@ def set_run_color(run, color):
     rPr = run._r.get_or_add_rPr()
 
     # 既存のcolorを削除
-    for c in rPr.findall(qn('w:color')):
-        rPr.remove(c)
+    existing = next(rPr.iterchildren(_Q_COLOR), None)
+    if existing is not None:
+        rPr.remove(existing)
 
     # 新しいcolorを作成
-    color_elem = OxmlElement('w:color')
-    color_elem.set(qn('w:val'), color)
-    rPr.append(color_elem)
+    SubElement(rPr, _Q_COLOR, {_Q_VAL: color})
 
 
 def set_paragraph_run_color(paragraph, color):
@@ -54,27 +57,70 @@ def set_paragraph_run_color(paragraph, color):
     pPr = paragraph._p.get_or_add_pPr()
 
     # rPrを取得または作成
-    rPr = pPr.find(qn('w:rPr'))
+    rPr = pPr.find(_Q_RPR)
     if rPr is None:
-        rPr = OxmlElement('w:rPr')
-        pPr.append(rPr)
+        rPr = SubElement(pPr, _Q_RPR)
 
     # 既存のcolorを削除
-    for c in rPr.findall(qn('w:color')):
-        rPr.remove(c)
+    existing = next(rPr.iterchildren(_Q_COLOR), None)
+    if existing is not None:
+        rPr.remove(existing)
 
     # 新しいcolorを作成
-    color_elem = OxmlElement('w:color')
-    color_elem.set(qn('w:val'), color)
-    rPr.append(color_elem)
+    SubElement(rPr, _Q_COLOR, {_Q_VAL: color})
+
+
+def has_cell_shading(cell, color):
+    """セルの背景色が既に指定の色になっているか確認する"""
+    tcPr = cell._tc.tcPr
+    if tcPr is None:
+        return False
+    shd = next(tcPr.iterchildren(_Q_SHD), None)
+    return shd is not None and shd.get(_Q_FILL) == color
+
+
+def has_rpr_color(rPr, color):
+    """rPrの文字色が既に指定の色になっているか確認する"""
+    if rPr is None:
+        return False
+    c = next(rPr.iterchildren(_Q_COLOR), None)
+    return c is not None and c.get(_Q_VAL) == color
+
+
+def has_paragraph_run_color(paragraph, color):
+    """段落内のすべてのrunと段落記号の文字色が既に指定の色になっているか確認する"""
+    for run in paragraph.runs:
+        if not has_rpr_color(run._r.rPr, color):
+            return False
+
+    pPr = paragraph._p.pPr
+    return pPr is not None and has_rpr_color(pPr.find(_Q_RPR), color)
+
+
+def is_header_row_formatted(cells, header_bg_color, text_color):
+    """ヘッダー行のすべてのセルが既に指定の背景色・文字色になっているか確認する"""
+    for cell in cells:
+        if not has_cell_shading(cell, header_bg_color):
+            return False
+        for paragraph in cell.paragraphs:
+            if not has_paragraph_run_color(paragraph, text_color):
+                return False
+    return True
 
 
 def process_table_headers(doc, header_bg_color, text_color):
-    """すべてのテーブルのヘッダー行を処理する"""
+    """すべてのテーブルのヘッダー行を処理する
+
+    ヘッダー行のすべてのセルが既に指定の背景色・文字色の場合は、処理済みとしてスキップする
+    """
     for table in doc.tables:
         if len(table.rows) > 0:
             header_row = table.rows[0]
-            for cell in header_row.cells:
+            cells = header_row.cells
+            if is_header_row_formatted(cells, header_bg_color, text_color):
+                continue
+
+            for cell in cells:
                 # 背景色を設定
                 set_cell_shading(cell, header_bg_color)
 
@@ -88,23 +134,22 @@ def main():
         print("Usage: python docx-table-title.py <変換元ファイル名>")
         sys.exit(1)
 
-    input_file = sys.argv[1]
+    input_path = Path(sys.argv[1])
 
-    if not os.path.exists(input_file):
-        print(f"Error: ファイルが見つかりません: {input_file}")
+    if not input_path.exists():
+        print(f"Error: ファイルが見つかりません: {input_path}")
         sys.exit(1)
 
     # 出力先フォルダを作成
-    input_dir = os.path.dirname(os.path.abspath(input_file))
-    output_dir = os.path.join(input_dir, "changed")
-    os.makedirs(output_dir, exist_ok=True)
+    output_dir = input_path.resolve().parent / "changed"
+    output_dir.mkdir(exist_ok=True)
 
     # 出力ファイルパス
-    output_file = os.path.join(output_dir, os.path.basename(input_file))
+    output_file = output_dir / input_path.name
 
     try:
         # ドキュメントを読み込む
-        doc = Document(input_file)
+        doc = Document(input_path)
 
         # テーブルヘッダーを処理
         # 深い青: 003366 または 1F4E79
@@ -5,18 +5,76 @@ top-page.py - DOCXファイルのヘッダー、フッター、表紙をテン
 
 使用例:
     python top-page.py "sample/21GXP-D-001 ソフトウェア要求仕様書.docx" --DocCode D-001 --DocName ソフトウェア要求仕様書 --Version 1.0
+    python top-page.py a.docx b.docx --DocCode D-001   # 複数ファイルを一括変換
 """
 
 import argparse
+import re
 import sys
+from bisect import bisect_right
+from itertools import accumulate
 from pathlib import Path
-from copy import deepcopy
+from xml.sax.saxutils import escape
 
 from docx import Document
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+from docx.oxml.ns import qn, nsmap
+from docx.oxml import parse_xml
 from docx.shared import Mm
 from lxml import etree
+from lxml.etree import SubElement
+
+# 名前空間と、繰り返し使う検索式を事前にコンパイルしておく
+NS = {'w': nsmap['w']}
+_XP_R = etree.XPath('.//w:r', namespaces=NS)
+_XP_T = etree.XPath('.//w:t', namespaces=NS)
+_XP_TAB = etree.XPath('.//w:tab', namespaces=NS)
+_HAS_PAGEBREAK = etree.XPath('boolean(.//w:br[@w:type="page"])', namespaces=NS)
+# 段落の中身を集める前に、置換・削除の対象になり得るかを判定する
+_HAS_DOLLAR = etree.XPath("boolean(.//w:t[contains(text(), '$')])", namespaces=NS)
+_HAS_販売名 = etree.XPath("boolean(.//w:t[contains(text(), '販売名')])", namespaces=NS)
+# シリアライズ済みXML中のw:t要素（開始タグの属性と本文）
+_W_T_TEXT = re.compile(rb'<w:t(?P<attrs>(?:\s[^>]*)?)(?<!/)>(?P<text>[^<]*)</w:t>')
+
+# 1mm ≈ 56.7 twips
+_TWIPS_PER_MM = 56.7
+
+# qn()の結果をモジュール読み込み時にキャッシュしておく
+_Q_P = qn('w:p')
+_Q_TBL = qn('w:tbl')
+_Q_SECTPR = qn('w:sectPr')
+_Q_T = qn('w:t')
+_Q_XML_SPACE = qn('xml:space')
+_Q_VAL = qn('w:val')
+_Q_FLDCHARTYPE = qn('w:fldCharType')
+_Q_PGNUMTYPE = qn('w:pgNumType')
+_Q_FMT = qn('w:fmt')
+_Q_START = qn('w:start')
+_Q_TCPR = qn('w:tcPr')
+_Q_TCW = qn('w:tcW')
+_Q_W = qn('w:w')
+_Q_TYPE = qn('w:type')
+_Q_TBLPR = qn('w:tblPr')
+_Q_TBLLAYOUT = qn('w:tblLayout')
+_Q_TBLW = qn('w:tblW')
+_Q_TR = qn('w:tr')
+_Q_TC = qn('w:tc')
+_Q_TBLGRID = qn('w:tblGrid')
+_Q_GRIDCOL = qn('w:gridCol')
+_Q_PPR = qn('w:pPr')
+_Q_JC = qn('w:jc')
+_Q_R = qn('w:r')
+_Q_FLDCHAR = qn('w:fldChar')
+_Q_INSTRTEXT = qn('w:instrText')
+
+
+def _serialize_children(element):
+    """要素の子要素をまとめてシリアライズする"""
+    return b''.join(etree.tostring(child) for child in element)
+
+
+def _parse_children(xml):
+    """_serialize_childrenでシリアライズしたXMLを1回でパースし、要素リストを返す"""
+    return list(parse_xml(b'<root>' + xml + b'</root>'))
 
 
 class DocxFormatter:
@@ -28,8 +86,47 @@ class DocxFormatter:
             template_path: テンプレートファイルのパス
             variables: 置換する変数の辞書 {'DocCode': 'D-001', ...}
         """
-        self.template_doc = Document(template_path)
         self.variables = variables
+        # すべての変数を1回の走査で置換するためのパターン
+        # 名前が前方一致する変数があっても長いほうを優先するよう、長い順に並べる
+        self._var_pattern = (
+            re.compile(r'\$(' + '|'.join(
+                re.escape(k) for k in sorted(variables, key=len, reverse=True)
+            ) + ')')
+            if variables else None
+        )
+        # シリアライズ済みXMLに適用する同じパターンのbytes版と、XMLエスケープ済みの値
+        self._var_pattern_bytes = (
+            re.compile(self._var_pattern.pattern.encode()) if variables else None
+        )
+        self._var_values_xml = {
+            name.encode(): escape(value).encode() for name, value in variables.items()
+        }
+
+        # テンプレートの表紙・ヘッダーは変換元ごとに変わらないため、
+        # シリアライズした形で一度だけ作成しておく（複数ファイルの変換で再利用）
+        # テンプレートのDOMはここでしか使わないので保持せず、変換中のメモリを抑える
+        template_doc = Document(template_path)
+        template_cover = self._get_cover_page_elements(template_doc)
+        # パターンと置換値（UTF-8）に合わせ、非ASCII文字を文字参照にせずUTF-8で出力する
+        cover_xml = b''.join(etree.tostring(elem, encoding='utf-8') for elem in template_cover)
+        if self._has_split_variable(template_cover):
+            # runに分割された変数がある場合は、段落単位の結合置換だけで処理する
+            # （2種類の置換を重ねると、値に含まれる$変数名が再置換されるため）
+            new_cover = _parse_children(cover_xml)
+            for elem in new_cover:
+                self._replace_variables_in_element(elem)
+            cover_xml = b''.join(etree.tostring(elem, encoding='utf-8') for elem in new_cover)
+        else:
+            cover_xml = self._replace_variables_in_xml(cover_xml)
+        self._template_cover_xml = cover_xml
+        self._template_header_xml = []
+        for section in template_doc.sections:
+            first_header_xml = None
+            if section.first_page_header is not None:
+                first_header_xml = _serialize_children(section.first_page_header._element)
+            header_xml = _serialize_children(section.header._element)
+            self._template_header_xml.append((first_header_xml, header_xml))
 
     def format(self, source_path, output_path):
         """ソースファイルをフォーマットして出力する
@@ -40,13 +137,10 @@ class DocxFormatter:
         """
         self.target_doc = Document(source_path)
 
-        # 1. ヘッダーをテンプレートからコピー
-        self._copy_headers()
-
-        # 2. フッターをテンプレートからコピー
-        self._copy_footers()
+        # 1. ヘッダーをテンプレートからコピーし、フッターを設定
+        self._copy_headers_and_footers()
 
-        # 3. 表紙をテンプレートで置き換え
+        # 2. 表紙をテンプレートで置き換え
         self._replace_cover_page()
 
         # 出力ディレクトリを作成
@@ -62,86 +156,127 @@ class DocxFormatter:
 
         変数が複数のw:r（run）に分割されている場合に対応
         """
-        for para in element.iter(qn('w:p')):
-            runs = list(para.iter(qn('w:r')))
-            if not runs:
+        # 1回の走査で段落を列挙し、段落ごとにテキスト要素を集める
+        for _, para in etree.iterwalk(element, events=('end',), tag=_Q_P):
+            # 「$」を含むw:tがない段落には変数がない
+            if not _HAS_DOLLAR(para):
                 continue
 
             # 全テキストを結合
-            full_text = ''
+            parts = []
             text_elements = []
-            for run in runs:
-                for t in run.iter(qn('w:t')):
-                    if t.text:
-                        full_text += t.text
-                        text_elements.append(t)
+            for t in para.iterdescendants(_Q_T):
+                if t.text:
+                    parts.append(t.text)
+                    text_elements.append(t)
+            full_text = ''.join(parts)
 
             # 変数が含まれているか確認
-            has_variable = any(f'${var}' in full_text for var in self.variables.keys())
-            if not has_variable:
+            if self._var_pattern is None or not self._var_pattern.search(full_text):
                 continue
 
             # 変数を置換
-            new_text = full_text
-            for var_name, var_value in self.variables.items():
-                new_text = new_text.replace(f'${var_name}', var_value)
+            new_text = self._var_pattern.sub(lambda m: self.variables[m.group(1)], full_text)
 
             # 最初のテキスト要素に全テキストを設定し、残りをクリア
             if text_elements:
                 text_elements[0].text = new_text
-                text_elements[0].set(qn('xml:space'), 'preserve')
+                text_elements[0].set(_Q_XML_SPACE, 'preserve')
                 for t in text_elements[1:]:
                     t.text = ''
 
+    def _has_split_variable(self, elements):
+        """複数のw:tにまたがって分割された変数があるか確認する"""
+        if self._var_pattern is None:
+            return False
+
+        for element in elements:
+            for _, para in etree.iterwalk(element, events=('end',), tag=_Q_P):
+                if not _HAS_DOLLAR(para):
+                    continue
+
+                texts = [t.text for t in para.iterdescendants(_Q_T) if t.text]
+
+                # 結合したテキスト上での各w:tの終了位置
+                ends = list(accumulate(len(text) for text in texts))
+
+                # 結合したテキストで見つかった変数が、w:tの境界をまたいでいれば分割されている
+                for m in self._var_pattern.finditer(''.join(texts)):
+                    t_end = ends[bisect_right(ends, m.start())]
+                    if m.end() > t_end:
+                        return True
+
+        return False
+
+    def _replace_variables_in_xml(self, xml):
+        """シリアライズ済みのXML（bytes）のw:tの本文に含まれる変数を置換する
+
+        属性値は対象外。runに分割されていない変数のみが対象で、
+        分割された変数は_replace_variables_in_elementで処理する
+        """
+        if self._var_pattern_bytes is None:
+            return xml
+
+        def replace_text(m):
+            text = m.group('text')
+            new_text = self._var_pattern_bytes.sub(
+                lambda v: self._var_values_xml[v.group(1)], text)
+            if new_text == text:
+                return m.group(0)
+
+            # 置換した値の前後の空白が失われないようにする
+            attrs = m.group('attrs')
+            if b'xml:space=' not in attrs:
+                attrs += b' xml:space="preserve"'
+            return b'<w:t' + attrs + b'>' + new_text + b'</w:t>'
+
+        return _W_T_TEXT.sub(replace_text, xml)
+
     def _remove_tab_before_販売名(self, element):
         """「販売名」の前のTAB文字を削除する（Wordバグ対応）"""
-        for para in element.iter(qn('w:p')):
-            runs = list(para.iter(qn('w:r')))
-            if not runs:
+        for _, para in etree.iterwalk(element, events=('end',), tag=_Q_P):
+            # 「販売名」を含むw:tがない段落は対象外
+            # （複数のrunに分割された「販売名」は下のrun単位の判定でも対象外）
+            if not _HAS_販売名(para):
                 continue
 
-            # 全テキストを結合して「販売名」が含まれるか確認
-            full_text = ''
-            for run in runs:
-                for t in run.iter(qn('w:t')):
-                    if t.text:
-                        full_text += t.text
-
-            if '販売名' not in full_text:
-                continue
+            runs = _XP_R(para)
 
             # 各run内のタブ要素を探して削除
             for i, run in enumerate(runs):
                 # このrunに「販売名」が含まれているか確認
                 run_has_販売名 = False
-                for t in run.iter(qn('w:t')):
+                for t in _XP_T(run):
                     if t.text and '販売名' in t.text:
                         run_has_販売名 = True
                         break
 
                 if run_has_販売名:
                     # このrun内のタブ要素を削除
-                    tabs_to_remove = list(run.iter(qn('w:tab')))
+                    tabs_to_remove = _XP_TAB(run)
                     for tab in tabs_to_remove:
                         tab.getparent().remove(tab)
 
                     # 前のrunにタブがあれば削除
                     if i > 0:
                         prev_run = runs[i - 1]
-                        prev_tabs = list(prev_run.iter(qn('w:tab')))
+                        prev_tabs = _XP_TAB(prev_run)
                         for tab in prev_tabs:
                             tab.getparent().remove(tab)
 
-    def _copy_header_element(self, source_header, target_header):
-        """ヘッダー要素をコピーする"""
+    def _copy_header_element(self, source_xml, target_header):
+        """ヘッダー要素をコピーする
+
+        Args:
+            source_xml: シリアライズ済みのテンプレートヘッダーの子要素
+            target_header: コピー先のヘッダー要素
+        """
         # ターゲットヘッダーをクリア
         for child in list(target_header):
             target_header.remove(child)
 
-        # ソースヘッダーの子要素をコピー
-        for child in source_header:
-            new_child = deepcopy(child)
-            target_header.append(new_child)
+        # ソースヘッダーの子要素をパースして追加
+        target_header.extend(_parse_children(source_xml))
 
         # 変数を置換
         self._replace_variables_in_element(target_header)
@@ -149,27 +284,43 @@ class DocxFormatter:
         # Wordバグ対応：「販売名」の前のTAB文字を削除
         self._remove_tab_before_販売名(target_header)
 
-    def _copy_headers(self):
-        """テンプレートのヘッダーをコピーする
+    def _copy_headers_and_footers(self):
+        """テンプレートのヘッダーをコピーし、フッターを設定する
 
-        表紙と表紙以外のヘッダーは別設定として扱う
+        セクションを1回だけ走査して、ヘッダーとフッターをまとめて処理する。
+        表紙と表紙以外のヘッダーは別設定として扱う。
+        表紙はフッターを表示しない、他はPAGEフィールドのみで -1- 形式
         """
+        n_template = len(self._template_header_xml)
+
         for i, target_section in enumerate(self.target_doc.sections):
-            template_section = self.template_doc.sections[min(i, len(self.template_doc.sections) - 1)]
+            first_header_xml, header_xml = self._template_header_xml[min(i, n_template - 1)]
 
-            # First page header（表紙用）
-            if template_section.first_page_header is not None:
-                # different_first_page_header_footerを有効にする
+            # different_first_page_header_footerを有効にする（表紙用ヘッダー・フッター）
+            # 既に有効な場合はsectPrを書き換えない
+            if not target_section.different_first_page_header_footer:
                 target_section.different_first_page_header_footer = True
 
-                source_first_header = template_section.first_page_header._element
+            # First page header（表紙用）
+            if first_header_xml is not None:
                 target_first_header = target_section.first_page_header._element
-                self._copy_header_element(source_first_header, target_first_header)
+                self._copy_header_element(first_header_xml, target_first_header)
 
             # 通常のヘッダー（表紙以外）
-            source_header = template_section.header._element
             target_header = target_section.header._element
-            self._copy_header_element(source_header, target_header)
+            self._copy_header_element(header_xml, target_header)
+
+            # ページ番号書式を -1- 形式に設定
+            self._set_page_number_format(target_section)
+
+            # First page footer（表紙用）- 空にする
+            target_first_footer = target_section.first_page_footer._element
+            for child in list(target_first_footer):
+                target_first_footer.remove(child)
+
+            # 通常のフッター（PAGEフィールドのみ）
+            target_footer = target_section.footer._element
+            self._create_page_field_footer(target_footer)
 
     def _create_page_field_footer(self, footer_element):
         """PAGEフィールドのみを含むフッターを作成する
@@ -180,88 +331,38 @@ class DocxFormatter:
         for child in list(footer_element):
             footer_element.remove(child)
 
-        # 段落を作成
-        p = OxmlElement('w:p')
-
-        # 段落プロパティ（中央揃え）
-        pPr = OxmlElement('w:pPr')
-        jc = OxmlElement('w:jc')
-        jc.set(qn('w:val'), 'center')
-        pPr.append(jc)
-        p.append(pPr)
-
-        # runを作成
-        r = OxmlElement('w:r')
+        # 段落（中央揃え）
+        p = SubElement(footer_element, _Q_P)
+        pPr = SubElement(p, _Q_PPR)
+        SubElement(pPr, _Q_JC, {_Q_VAL: 'center'})
 
         # PAGEフィールドを作成
-        fldChar_begin = OxmlElement('w:fldChar')
-        fldChar_begin.set(qn('w:fldCharType'), 'begin')
-
-        instrText = OxmlElement('w:instrText')
-        instrText.set(qn('xml:space'), 'preserve')
+        r = SubElement(p, _Q_R)
+        SubElement(r, _Q_FLDCHAR, {_Q_FLDCHARTYPE: 'begin'})
+        r2 = SubElement(p, _Q_R)
+        instrText = SubElement(r2, _Q_INSTRTEXT, {_Q_XML_SPACE: 'preserve'})
         instrText.text = ' PAGE '
-
-        fldChar_separate = OxmlElement('w:fldChar')
-        fldChar_separate.set(qn('w:fldCharType'), 'separate')
-
-        fldChar_end = OxmlElement('w:fldChar')
-        fldChar_end.set(qn('w:fldCharType'), 'end')
-
-        r.append(fldChar_begin)
-        r2 = OxmlElement('w:r')
-        r2.append(instrText)
-        r3 = OxmlElement('w:r')
-        r3.append(fldChar_separate)
-        r4 = OxmlElement('w:r')
-        t = OxmlElement('w:t')
+        r3 = SubElement(p, _Q_R)
+        SubElement(r3, _Q_FLDCHAR, {_Q_FLDCHARTYPE: 'separate'})
+        r4 = SubElement(p, _Q_R)
+        t = SubElement(r4, _Q_T)
         t.text = '1'  # プレースホルダー
-        r4.append(t)
-        r5 = OxmlElement('w:r')
-        r5.append(fldChar_end)
-
-        p.append(r)
-        p.append(r2)
-        p.append(r3)
-        p.append(r4)
-        p.append(r5)
-
-        footer_element.append(p)
+        r5 = SubElement(p, _Q_R)
+        SubElement(r5, _Q_FLDCHAR, {_Q_FLDCHARTYPE: 'end'})
 
     def _set_page_number_format(self, section):
         """セクションのページ番号書式を -1- 形式に設定し、開始番号を0にする"""
         sectPr = section._sectPr
 
         # 既存のpgNumTypeを探すか作成
-        pgNumType = sectPr.find(qn('w:pgNumType'))
+        pgNumType = sectPr.find(_Q_PGNUMTYPE)
         if pgNumType is None:
-            pgNumType = OxmlElement('w:pgNumType')
-            sectPr.append(pgNumType)
+            pgNumType = SubElement(sectPr, _Q_PGNUMTYPE)
 
         # ページ番号書式を numberInDash (-1-) に設定
-        pgNumType.set(qn('w:fmt'), 'numberInDash')
+        pgNumType.set(_Q_FMT, 'numberInDash')
         # 開始ページ番号を0に設定
-        pgNumType.set(qn('w:start'), '0')
-
-    def _copy_footers(self):
-        """フッターを設定する
-
-        表紙はフッターを表示しない、他はPAGEフィールドのみで -1- 形式
-        """
-        for i, target_section in enumerate(self.target_doc.sections):
-            # different_first_page_header_footerを有効にする（表紙はフッター非表示のため）
-            target_section.different_first_page_header_footer = True
-
-            # ページ番号書式を -1- 形式に設定
-            self._set_page_number_format(target_section)
-
-            # First page footer（表紙用）- 空にする
-            target_first_footer = target_section.first_page_footer._element
-            for child in list(target_first_footer):
-                target_first_footer.remove(child)
-
-            # 通常のフッター（PAGEフィールドのみ）
-            target_footer = target_section.footer._element
-            self._create_page_field_footer(target_footer)
+        pgNumType.set(_Q_START, '0')
 
     def _get_cover_page_elements(self, doc):
         """表紙ページの要素（最初のページブレイクまで）を取得する
@@ -272,37 +373,38 @@ class DocxFormatter:
         body = doc._body._body
         elements = []
 
-        for elem in body:
-            if elem.tag == qn('w:p'):
-                xml_str = etree.tostring(elem, encoding='unicode')
-                # ページブレイクが含まれている場合、この段落まで含めて終了
-                if 'w:br' in xml_str and 'w:type="page"' in xml_str:
-                    elements.append(elem)
-                    break
-                elements.append(elem)
-            elif elem.tag == qn('w:tbl'):
-                elements.append(elem)
-            elif elem.tag == qn('w:sectPr'):
+        for elem in body.iterchildren():
+            tag = elem.tag
+            if tag == _Q_SECTPR:
+                break
+
+            # 段落・テーブル・その他の要素はすべて表紙に含める
+            elements.append(elem)
+
+            # ページブレイクが含まれている段落まで含めて終了
+            if tag == _Q_P and _HAS_PAGEBREAK(elem):
                 break
-            else:
-                elements.append(elem)
 
         return elements
 
-    def _set_cell_width(self, tc, width_twips):
-        """セルの幅を設定する"""
-        tcPr = tc.find(qn('w:tcPr'))
+    def _set_cell_width(self, tc, tcW_attrib):
+        """セルの幅を設定する
+
+        Args:
+            tc: セルのXML要素
+            tcW_attrib: w:tcWに設定する属性の辞書（列ごとに事前作成したもの）
+        """
+        tcPr = tc.find(_Q_TCPR)
         if tcPr is None:
-            tcPr = OxmlElement('w:tcPr')
+            tcPr = tc.makeelement(_Q_TCPR)
             tc.insert(0, tcPr)
 
-        tcW = tcPr.find(qn('w:tcW'))
+        tcW = tcPr.find(_Q_TCW)
         if tcW is None:
-            tcW = OxmlElement('w:tcW')
-            tcPr.insert(0, tcW)
-
-        tcW.set(qn('w:w'), str(width_twips))
-        tcW.set(qn('w:type'), 'dxa')
+            # 属性付きで1回で作成する
+            tcPr.insert(0, tcPr.makeelement(_Q_TCW, tcW_attrib))
+        else:
+            tcW.attrib.update(tcW_attrib)
 
     def _set_table_column_widths(self, table_element, col1_mm, col2_mm):
         """テーブルの1列目と2列目の幅を設定する
@@ -312,60 +414,59 @@ class DocxFormatter:
             col1_mm: 1列目の幅（ミリメートル）
             col2_mm: 2列目の幅（ミリメートル）
         """
-        col1_twips = int(col1_mm * 56.7)  # 1mm ≈ 56.7 twips
-        col2_twips = int(col2_mm * 56.7)
+        col1_twips = int(col1_mm * _TWIPS_PER_MM)
+        col2_twips = int(col2_mm * _TWIPS_PER_MM)
         total_twips = col1_twips + col2_twips
 
+        # 列幅は全行で同じなので、各列のw:tcW属性を一度だけ作成する
+        tcW_attribs = (
+            {_Q_W: str(col1_twips), _Q_TYPE: 'dxa'},
+            {_Q_W: str(col2_twips), _Q_TYPE: 'dxa'},
+        )
+
         # テーブルプロパティを設定（レイアウトを固定に）
-        tblPr = table_element.find(qn('w:tblPr'))
+        tblPr = table_element.find(_Q_TBLPR)
         if tblPr is not None:
             # tblLayoutをfixedに設定（自動調整を無効化）
-            tblLayout = tblPr.find(qn('w:tblLayout'))
+            tblLayout = tblPr.find(_Q_TBLLAYOUT)
             if tblLayout is None:
-                tblLayout = OxmlElement('w:tblLayout')
-                tblPr.append(tblLayout)
-            tblLayout.set(qn('w:type'), 'fixed')
+                SubElement(tblPr, _Q_TBLLAYOUT, {_Q_TYPE: 'fixed'})
+            else:
+                tblLayout.set(_Q_TYPE, 'fixed')
 
             # tblWを固定幅に設定
-            tblW = tblPr.find(qn('w:tblW'))
+            tblW = tblPr.find(_Q_TBLW)
             if tblW is None:
-                tblW = OxmlElement('w:tblW')
-                tblPr.append(tblW)
-            tblW.set(qn('w:w'), str(total_twips))
-            tblW.set(qn('w:type'), 'dxa')
+                SubElement(tblPr, _Q_TBLW, {_Q_W: str(total_twips), _Q_TYPE: 'dxa'})
+            else:
+                tblW.set(_Q_W, str(total_twips))
+                tblW.set(_Q_TYPE, 'dxa')
 
         # テーブルの直接の子要素であるtr（行）を取得
-        for tr in table_element.findall(qn('w:tr')):
-            # 行の直接の子要素であるtc（セル）を取得
-            tcs = tr.findall(qn('w:tc'))
-            if len(tcs) >= 1:
-                self._set_cell_width(tcs[0], col1_twips)
-            if len(tcs) >= 2:
-                self._set_cell_width(tcs[1], col2_twips)
+        for tr in table_element.iterchildren(_Q_TR):
+            # 行の直接の子要素であるtc（セル）のうち、1列目と2列目を設定
+            for tc, tcW_attrib in zip(tr.iterchildren(_Q_TC), tcW_attribs):
+                self._set_cell_width(tc, tcW_attrib)
 
         # テーブルグリッドの列幅も設定
-        tblGrid = table_element.find(qn('w:tblGrid'))
+        tblGrid = table_element.find(_Q_TBLGRID)
         if tblGrid is not None:
-            gridCols = tblGrid.findall(qn('w:gridCol'))
+            gridCols = tblGrid.findall(_Q_GRIDCOL)
             if len(gridCols) >= 1:
-                gridCols[0].set(qn('w:w'), str(col1_twips))
+                gridCols[0].set(_Q_W, str(col1_twips))
             if len(gridCols) >= 2:
-                gridCols[1].set(qn('w:w'), str(col2_twips))
+                gridCols[1].set(_Q_W, str(col2_twips))
 
     def _replace_cover_page(self):
         """変換元の表紙をテンプレートの表紙で置き換える"""
-        template_body = self.template_doc._body._body
         target_body = self.target_doc._body._body
 
-        # テンプレートの表紙要素を取得
-        template_cover = self._get_cover_page_elements(self.template_doc)
-
         # 変換元の表紙要素を取得
         target_cover = self._get_cover_page_elements(self.target_doc)
 
         # 変換元の表紙要素の最初の要素の前の位置を記録
         if target_cover:
-            insert_position = list(target_body).index(target_cover[0])
+            insert_position = target_body.index(target_cover[0])
         else:
             insert_position = 0
 
@@ -373,19 +474,19 @@ class DocxFormatter:
         for elem in target_cover:
             target_body.remove(elem)
 
-        # テンプレートの表紙要素をコピーして挿入
-        first_table = True
-        for i, elem in enumerate(template_cover):
-            new_elem = deepcopy(elem)
-            # 変数を置換
-            self._replace_variables_in_element(new_elem)
+        # 事前にシリアライズ・変数置換したテンプレートの表紙を1回のパースで複製する
+        new_cover = _parse_children(self._template_cover_xml)
 
+        # 複製した表紙要素を挿入
+        first_table = True
+        for new_elem in new_cover:
             # 最初のテーブルの1列目を45mm、2列目を135mmに設定
-            if new_elem.tag == qn('w:tbl') and first_table:
+            if new_elem.tag == _Q_TBL and first_table:
                 self._set_table_column_widths(new_elem, 45, 135)
                 first_table = False
 
-            target_body.insert(insert_position + i, new_elem)
+        # スライス代入で一括挿入する
+        target_body[insert_position:insert_position] = new_cover
 
 
 def main():
@@ -398,7 +499,8 @@ def main():
         '''
     )
 
-    parser.add_argument('source', type=str, help='変換元のDOCXファイルパス')
+    parser.add_argument('source', type=str, nargs='+',
+                        help='変換元のDOCXファイルパス（複数指定可）')
     parser.add_argument('--template', type=str, default='template.docx',
                         help='テンプレートファイルパス (default: template.docx)')
     parser.add_argument('--DocCode', type=str, default='D-000',
@@ -411,22 +513,20 @@ def main():
     args = parser.parse_args()
 
     # パスの処理
-    source_path = Path(args.source)
+    source_paths = [Path(source) for source in args.source]
     template_path = Path(args.template)
 
     # 変換元ファイルの存在確認
-    if not source_path.exists():
-        print(f'エラー: 変換元ファイルが見つかりません: {source_path}', file=sys.stderr)
-        sys.exit(1)
+    for source_path in source_paths:
+        if not source_path.exists():
+            print(f'エラー: 変換元ファイルが見つかりません: {source_path}', file=sys.stderr)
+            sys.exit(1)
 
     # テンプレートファイルの存在確認
     if not template_path.exists():
         print(f'エラー: テンプレートファイルが見つかりません: {template_path}', file=sys.stderr)
         sys.exit(1)
 
-    # 出力パスの設定（sourceの親ディレクトリ/changed/ファイル名）
-    output_path = source_path.parent / 'changed' / source_path.name
-
     # 変数の設定
     variables = {
         'DocCode': args.DocCode,
@@ -434,9 +534,12 @@ def main():
         'Version': args.Version,
     }
 
-    # フォーマット実行
+    # フォーマット実行（テンプレートの読み込みは1回だけ行い、全ファイルで再利用する）
     formatter = DocxFormatter(template_path, variables)
-    formatter.format(source_path, output_path)
+    for source_path in source_paths:
+        # 出力パスの設定（sourceの親ディレクトリ/changed/ファイル名）
+        output_path = source_path.parent / 'changed' / source_path.name
+        formatter.format(source_path, output_path)
 
 
 if __name__ == '__main__':